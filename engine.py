@@ -12,9 +12,10 @@ A 3ds Max (2017+) engine for Toolkit based mostly on pymxs and also uses MaxPlus
 on older Max releases.
 """
 from __future__ import print_function
+import collections
 import os
+import threading
 import time
-import math
 import sgtk
 
 import pymxs
@@ -28,6 +29,61 @@ try:
 except ImportError:
     pass
 
+# Style sheets read from disk by the engine, keyed by file path. Each entry holds
+# the file's modification time and its contents, so that a style sheet is only
+# read again once it has changed on disk.
+_QSS_CACHE = {}
+
+# MaxScript run on postLoadingMenus so the engine can add its menu back.
+# Before 3ds Max 2021 we can't pass in a Python function as a callback,
+# so we're passing in piece of MaxScript instead.
+_POST_LOADING_MENUS_SCRIPT = 'python.execute "{0}"'.format(
+    "\n".join(
+        [
+            "import sgtk",
+            "engine = sgtk.platform.current_engine()",
+            "engine._on_menus_loaded()",
+        ]
+    )
+)
+
+# The Qt modules set up by core for the engine, imported on first use by _qt.
+_QT_MODULES = None
+
+
+def _qt():
+    """
+    Returns the ``(QtCore, QtGui)`` modules set up by core for the engine.
+
+    They can't be imported when this module is loaded, since core only
+    populates sgtk.platform.qt once the engine has started.
+    """
+    global _QT_MODULES
+    if _QT_MODULES is None:
+        from sgtk.platform.qt import QtCore, QtGui
+
+        _QT_MODULES = (QtCore, QtGui)
+    return _QT_MODULES
+
+
+# MaxScript Name objects used by the engine, created on first use by _mxs_names.
+_MXS_NAMES = None
+
+
+def _mxs_names():
+    """
+    Returns a dictionary of the MaxScript Name objects used by the engine.
+
+    They are created once, since every Name() call goes through MaxScript.
+    """
+    global _MXS_NAMES
+    if _MXS_NAMES is None:
+        _MXS_NAMES = {
+            "postLoadingMenus": pymxs.runtime.Name("postLoadingMenus"),
+            "sg_tk_on_menus_loaded": pymxs.runtime.Name("sg_tk_on_menus_loaded"),
+        }
+    return _MXS_NAMES
+
 
 class MaxEngine(sgtk.platform.Engine):
     """
@@ -58,16 +114,19 @@ class MaxEngine(sgtk.platform.Engine):
         References:
         http://docs.autodesk.com/3DSMAX/16/ENU/3ds-Max-Python-API-Documentation/index.html
         """
+        if self._host_info is not None:
+            return self._host_info
+
         host_info = {"name": "3ds Max", "version": "unknown"}
 
         try:
-            host_info["version"] = str(
-                self._max_version_to_year(self._get_max_version())
-            )
+            host_info["version"] = str(self._get_max_year())
         except:
-            # Fallback to initialized values above
-            pass
+            # Fallback to initialized values above, without caching them so
+            # the version can still be identified on a later call.
+            return host_info
 
+        self._host_info = host_info
         return host_info
 
     def __init__(self, *args, **kwargs):
@@ -79,9 +138,31 @@ class MaxEngine(sgtk.platform.Engine):
         # __init__() because the initialization may need those
         # variables.
         self._parent_to_max = True
-        self._dock_widgets = []
+        # Dock widgets opened by the engine, keyed by their object name.
+        self._dock_widgets_by_id = {}
 
         self._max_version = None
+        self._max_year = None
+        self._host_info = None
+        self._tk_3dsmax = None
+        self._main_window = None
+        self._menu_generator = None
+        # Set here rather than in pre_app_init, so destroy_engine can use it
+        # even when the engine failed to initialize.
+        self._callbacks = pymxs.runtime.callbacks
+
+        # Set while the SG menu is being built. MaxScript runs everything from the
+        # main thread, so a plain flag is enough to guard against re-entrance.
+        self._building_menu = False
+
+        # Path to the engine's style.qss, resolved in pre_app_init once the
+        # bundle's disk location is known.
+        self._qss_file = None
+
+        # Log messages waiting to be printed from the main thread.
+        self._log_buffer = collections.deque()
+        self._log_lock = threading.Lock()
+        self._log_flush_pending = False
 
         # proceed about your business
         sgtk.platform.Engine.__init__(self, *args, **kwargs)
@@ -96,6 +177,18 @@ class MaxEngine(sgtk.platform.Engine):
         """
         return True
 
+    @property
+    def tk_3dsmax(self):
+        """
+        The engine's ``tk_3dsmax`` module, imported the first time it is needed.
+
+        This needs to be available to apps as it will be used in show_dialog
+        when perforce asks for login info very early on.
+        """
+        if self._tk_3dsmax is None:
+            self._tk_3dsmax = self.import_module("tk_3dsmax")
+        return self._tk_3dsmax
+
     ##########################################################################################
     # init
 
@@ -103,77 +196,136 @@ class MaxEngine(sgtk.platform.Engine):
         """
         Called before all apps have initialized
         """
-        from sgtk.platform.qt import QtCore, QtGui
-
         self.log_debug("%s: Initializing..." % self)
 
-        if self._get_max_version() > MaxEngine.MAXIMUM_SUPPORTED_VERSION:
-            # Untested max version
+        # The engine is initialized from the main thread, so the version can be
+        # queried directly here rather than marshaled by _get_max_version later.
+        if self._max_version is None:
+            self._max_version = pymxs.runtime.maxVersion()[0]
 
-            highest_supported_version = self._max_version_to_year(
-                MaxEngine.MAXIMUM_SUPPORTED_VERSION
+        self._qss_file = os.path.join(
+            self.disk_location, sgtk.platform.constants.BUNDLE_STYLESHEET_FILE
+        )
+        if not os.path.isfile(self._qss_file):
+            self.log_warning(
+                "Engine stylesheet '%s' is missing and won't be applied."
+                % self._qss_file
             )
 
-            msg = (
-                "SG Pipeline Toolkit!\n\n"
-                "The SG Pipeline Toolkit has not yet been fully tested with 3ds Max versions greater than %s. "
-                "You can continue to use the Toolkit but you may experience bugs or instability. "
-                "Please report any issues you see via %s."
-                % (
-                    highest_supported_version,
-                    sgtk.support_url,
-                )
+        self._check_supported_version()
+
+        self._safe_dialog = set()
+
+        self._install_qt_plugin_path()
+        self._install_dialog_events()
+        self._install_stylesheet()
+
+        # The "qss_watcher" setting causes us to monitor the engine's
+        # style.qss file and re-apply it on the fly when it changes
+        # on disk. This is very useful for development work,
+        if self.get_setting("qss_watcher", False):
+            self._install_qss_watcher()
+
+    def _check_supported_version(self):
+        """
+        Warns the user when running in a version of 3ds Max that hasn't been
+        tested with Toolkit yet.
+        """
+        if self._get_max_version() <= MaxEngine.MAXIMUM_SUPPORTED_VERSION:
+            return
+
+        # Untested max version
+        QtCore, QtGui = _qt()
+
+        highest_supported_version = self._max_version_to_year(
+            MaxEngine.MAXIMUM_SUPPORTED_VERSION
+        )
+
+        msg = (
+            "SG Pipeline Toolkit!\n\n"
+            "The SG Pipeline Toolkit has not yet been fully tested with 3ds Max versions greater than %s. "
+            "You can continue to use the Toolkit but you may experience bugs or instability. "
+            "Please report any issues you see via %s."
+            % (
+                highest_supported_version,
+                sgtk.support_url,
             )
+        )
 
-            # Display warning dialog
-            max_year = self._max_version_to_year(self._get_max_version())
-            max_next_year = highest_supported_version + 1
-            if max_year >= self.get_setting(
-                "compatibility_dialog_min_version", max_next_year
-            ):
-                QtGui.QMessageBox.warning(
-                    None, "SG Warning", "Warning - {0}".format(msg)
-                )
-            # and log the warning
-            self.log_warning(msg)
+        # Display warning dialog
+        max_year = self._get_max_year()
+        max_next_year = highest_supported_version + 1
+        if max_year >= self.get_setting(
+            "compatibility_dialog_min_version", max_next_year
+        ):
+            QtGui.QMessageBox.warning(None, "SG Warning", "Warning - {0}".format(msg))
+        # and log the warning
+        self.log_warning(msg)
 
-        self._safe_dialog = []
+    def _install_qt_plugin_path(self):
+        """
+        Adds 3ds Max's Qt plugins folder to the library paths.
+        """
+        QtCore, QtGui = _qt()
 
         # Add image formats since max doesn't add the correct paths by default and jpeg won't be readable
+        #
+        # Qt ignores a path that is already in its library paths, so this is
+        # cheap when the engine is restarted.
         maxpath = QtCore.QCoreApplication.applicationDirPath()
         pluginsPath = os.path.join(maxpath, "plugins")
         QtCore.QCoreApplication.addLibraryPath(pluginsPath)
 
+    def _install_dialog_events(self):
+        """
+        Creates the event filter installed on every dialog created by the engine.
+        """
+        QtCore, QtGui = _qt()
+
         # Window focus objects are used to enable proper keyboard handling by the window instead of 3dsMax's accelerators
-        engine = self
+        #
+        # The filter sees every event sent to our dialogs, so everything it needs
+        # is bound up front instead of being looked up on each event.
+        runtime = pymxs.runtime
+        safe_dialog = self._safe_dialog
+        window_activate = QtCore.QEvent.WindowActivate
+        window_deactivate = QtCore.QEvent.WindowDeactivate
+        close = QtCore.QEvent.Close
 
         class DialogEvents(QtCore.QObject):
             def eventFilter(self, obj, event):
-                if event.type() == QtCore.QEvent.WindowActivate:
-                    pymxs.runtime.enableAccelerators = False
-                elif event.type() == QtCore.QEvent.WindowDeactivate:
-                    pymxs.runtime.enableAccelerators = True
-                # Remove from tracked dialogs
-                if event.type() == QtCore.QEvent.Close:
-                    if obj in engine._safe_dialog:
-                        engine._safe_dialog.remove(obj)
+                event_type = event.type()
+                if event_type == window_activate:
+                    runtime.enableAccelerators = False
+                elif event_type == window_deactivate:
+                    runtime.enableAccelerators = True
+                elif event_type == close:
+                    # Remove from tracked dialogs
+                    safe_dialog.discard(obj)
 
                 return False
 
         self.dialogEvents = DialogEvents()
 
-        # set up a qt style sheet
+    def _install_stylesheet(self):
+        """
+        Extends the 3ds Max stylesheet with the toolkit specific styling.
+        """
         # note! - try to be smart about this and only run
         # the style setup once per session - it looks like
         # 3dsmax slows down if this is executed every engine restart.
         #
+        # Core loads a fresh copy of this class every time the engine starts, so
+        # the marker comment in the stylesheet is what tells us it's installed.
+        QtCore, QtGui = _qt()
+
         # If we're in pre-Qt Max (before 2018) then we'll need to apply the
         # stylesheet to the QApplication. That's not safe in 2019.3+, as it's
         # possible that we'll get back a QCoreApplication from Max, which won't
         # carry references to a stylesheet. In that case, we apply our styling
         # to the dialog parent, which will be the top-level Max window.
-        if self._max_version_to_year(self._get_max_version()) < 2018:
-            parent_widget = sgtk.platform.qt.QtCore.QCoreApplication.instance()
+        if self._get_max_year() < 2018:
+            parent_widget = QtCore.QCoreApplication.instance()
         else:
             parent_widget = self._get_dialog_parent()
 
@@ -182,48 +334,60 @@ class MaxEngine(sgtk.platform.Engine):
         if "toolkit 3dsmax style extension" not in curr_stylesheet:
             # If we're in pre-2017 Max then we need to handle our own styling. Otherwise
             # we just inherit from Max.
-            if self._max_version_to_year(self._get_max_version()) < 2017:
+            if self._get_max_year() < 2017:
                 self._initialize_dark_look_and_feel()
 
-            curr_stylesheet += "\n\n /* toolkit 3dsmax style extension */ \n\n"
-            curr_stylesheet += (
-                "\n\n QDialog#TankDialog > QWidget { background-color: #343434; }\n\n"
-            )
-            parent_widget.setStyleSheet(curr_stylesheet)
-
-        # This needs to be present for apps as it will be used in
-        # show_dialog when perforce asks for login info very early on.
-        self.tk_3dsmax = self.import_module("tk_3dsmax")
-
-        # The "qss_watcher" setting causes us to monitor the engine's
-        # style.qss file and re-apply it on the fly when it changes
-        # on disk. This is very useful for development work,
-        if self.get_setting("qss_watcher", False):
-            self._qss_watcher = QtCore.QFileSystemWatcher(
-                [
-                    os.path.join(
-                        self.disk_location,
-                        sgtk.platform.constants.BUNDLE_STYLESHEET_FILE,
+            parent_widget.setStyleSheet(
+                "".join(
+                    (
+                        curr_stylesheet,
+                        "\n\n /* toolkit 3dsmax style extension */ \n\n",
+                        "\n\n QDialog#TankDialog > QWidget { background-color: #343434; }\n\n",
                     )
-                ]
+                )
             )
 
-            self._qss_watcher.fileChanged.connect(self.reload_qss)
+    def _install_qss_watcher(self):
+        """
+        Re-applies the engine's style.qss to its dialogs whenever it changes on disk.
+        """
+        QtCore, QtGui = _qt()
+
+        self._qss_watcher = QtCore.QFileSystemWatcher([self._qss_file])
+        self._qss_watcher.fileChanged.connect(self.reload_qss)
 
     def _add_shotgun_menu(self):
         """
         Add Shotgun menu to the main menu bar.
         """
+        if self._building_menu:
+            # Building the menu can cause 3ds Max to fire postLoadingMenus,
+            # which would rebuild the same menu from within itself.
+            self.log_debug("The SG menu is already being built, skipping.")
+            return
+
         self.log_debug("Adding the SG menu to the main menu bar.")
-        self._menu_generator.create_menu()
-        self.tk_3dsmax.MaxScript.enable_menu()
+        self._building_menu = True
+        try:
+            self._get_menu_generator().create_menu()
+            self.tk_3dsmax.MaxScript.enable_menu()
+        finally:
+            self._building_menu = False
 
     def _remove_shotgun_menu(self):
         """
         Remove Shotgun menu from the main menu bar.
         """
         self.log_debug("Removing the SG menu from the main menu bar.")
-        self._menu_generator.destroy_menu()
+        self._get_menu_generator().destroy_menu()
+
+    def _get_menu_generator(self):
+        """
+        Returns the menu generator for the SG menu, creating it on first use.
+        """
+        if self._menu_generator is None:
+            self._menu_generator = self.tk_3dsmax.MenuGenerator(self)
+        return self._menu_generator
 
     def _on_menus_loaded(self):
         """
@@ -245,26 +409,32 @@ class MaxEngine(sgtk.platform.Engine):
         """
         Called from the main thread when all apps have initialized
         """
-        # set up menu handler
-        self._menu_generator = self.tk_3dsmax.MenuGenerator(self)
         self._add_shotgun_menu()
 
         # Register a callback for the postLoadingMenus event.
-        python_code = "\n".join(
-            [
-                "import sgtk",
-                "engine = sgtk.platform.current_engine()",
-                "engine._on_menus_loaded()",
-            ]
-        )
-        # Unfortunately we can't pass in a Python function as a callback,
-        # so we're passing in piece of MaxScript instead.
-        pymxs.runtime.callbacks.addScript(
-            pymxs.runtime.Name("postLoadingMenus"),
-            'python.execute "{0}"'.format(python_code),
-            id=pymxs.runtime.Name("sg_tk_on_menus_loaded"),
+        # Starting with 2021, the callback can be the Python method itself, which
+        # skips going through MaxScript and python.execute on every event.
+        names = _mxs_names()
+        if self._get_max_year() >= 2021:
+            callback = self._on_menus_loaded
+        else:
+            callback = _POST_LOADING_MENUS_SCRIPT
+        self._callbacks.addScript(
+            names["postLoadingMenus"],
+            callback,
+            id=names["sg_tk_on_menus_loaded"],
         )
 
+        # Let 3ds Max finish drawing its UI before running the startup commands,
+        # which can be slow and open windows of their own.
+        QtCore, QtGui = _qt()
+        QtCore.QTimer.singleShot(0, self._deferred_startup)
+
+    def _deferred_startup(self):
+        """
+        Runs the startup commands and opens the startup file, if any, once
+        control has returned to the event loop.
+        """
         # Run a series of app instance commands at startup.
         self._run_app_instance_commands()
 
@@ -296,16 +466,17 @@ class MaxEngine(sgtk.platform.Engine):
         of the environment configuration yaml file.
         """
 
-        # Build a dictionary mapping app instance names to dictionaries of commands they registered with the engine.
-        app_instance_commands = {}
+        # Map (app instance name, command name) to the command's callback, and
+        # app instance names to the names of the commands they registered with
+        # the engine.
+        command_callbacks = {}
+        commands_by_instance = {}
         for (command_name, value) in self.commands.items():
             app_instance = value["properties"].get("app")
             if app_instance:
-                # Add entry 'command name: command function' to the command dictionary of this app instance.
-                command_dict = app_instance_commands.setdefault(
-                    app_instance.instance_name, {}
-                )
-                command_dict[command_name] = value["callback"]
+                instance_name = app_instance.instance_name
+                command_callbacks[(instance_name, command_name)] = value["callback"]
+                commands_by_instance.setdefault(instance_name, []).append(command_name)
 
         # Run the series of app instance commands listed in the 'run_at_startup' setting.
         for app_setting_dict in self.get_setting("run_at_startup", []):
@@ -313,45 +484,48 @@ class MaxEngine(sgtk.platform.Engine):
             # Menu name of the command to run or '' to run all commands of the given app instance.
             setting_command_name = app_setting_dict["name"]
 
-            # Retrieve the command dictionary of the given app instance.
-            command_dict = app_instance_commands.get(app_instance_name)
-
-            if command_dict is None:
-                self.log_warning(
-                    "%s configuration setting 'run_at_startup' requests app '%s' that is not installed."
-                    % (self.name, app_instance_name)
+            if app_instance_name not in commands_by_instance:
+                self.logger.warning(
+                    "%s configuration setting 'run_at_startup' requests app '%s' that is not installed.",
+                    self.name,
+                    app_instance_name,
                 )
             else:
                 if not setting_command_name:
                     # Run all commands of the given app instance.
-                    for (command_name, command_function) in command_dict.items():
-                        self.log_debug(
-                            "%s startup running app '%s' command '%s'."
-                            % (self.name, app_instance_name, command_name)
+                    for command_name in commands_by_instance[app_instance_name]:
+                        self.logger.debug(
+                            "%s startup running app '%s' command '%s'.",
+                            self.name,
+                            app_instance_name,
+                            command_name,
                         )
-                        command_function()
+                        command_callbacks[(app_instance_name, command_name)]()
                 else:
                     # Run the command whose name is listed in the 'run_at_startup' setting.
-                    command_function = command_dict.get(setting_command_name)
+                    command_function = command_callbacks.get(
+                        (app_instance_name, setting_command_name)
+                    )
                     if command_function:
-                        self.log_debug(
-                            "%s startup running app '%s' command '%s'."
-                            % (self.name, app_instance_name, setting_command_name)
+                        self.logger.debug(
+                            "%s startup running app '%s' command '%s'.",
+                            self.name,
+                            app_instance_name,
+                            setting_command_name,
                         )
                         command_function()
                     else:
                         known_commands = ", ".join(
-                            "'%s'" % name for name in command_dict
+                            "'%s'" % name
+                            for name in commands_by_instance[app_instance_name]
                         )
-                        self.log_warning(
+                        self.logger.warning(
                             "%s configuration setting 'run_at_startup' requests app '%s' unknown command '%s'. "
-                            "Known commands: %s"
-                            % (
-                                self.name,
-                                app_instance_name,
-                                setting_command_name,
-                                known_commands,
-                            )
+                            "Known commands: %s",
+                            self.name,
+                            app_instance_name,
+                            setting_command_name,
+                            known_commands,
                         )
 
     def destroy_engine(self):
@@ -360,9 +534,9 @@ class MaxEngine(sgtk.platform.Engine):
         """
         self.log_debug("%s: Destroying..." % self)
 
-        pymxs.runtime.callbacks.removeScripts(
-            pymxs.runtime.Name("postLoadingMenus"),
-            id=pymxs.runtime.Name("sg_tk_on_menus_loaded"),
+        names = _mxs_names()
+        self._callbacks.removeScripts(
+            names["postLoadingMenus"], id=names["sg_tk_on_menus_loaded"]
         )
         self._remove_shotgun_menu()
 
@@ -384,9 +558,37 @@ class MaxEngine(sgtk.platform.Engine):
     def _emit_log_message(self, handler, record):
         """
         Emits a log message.
+
+        Messages are buffered and printed in batches, so that a burst of log
+        records only queues a single call to the main thread.
         """
         msg_str = handler.format(record)
-        self.async_execute_in_main_thread(self._print_output, msg_str)
+        with self._log_lock:
+            self._log_buffer.append(msg_str)
+            if self._log_flush_pending:
+                # A flush is already queued and will pick this message up.
+                return
+            self._log_flush_pending = True
+
+        try:
+            self.async_execute_in_main_thread(self._flush_log_buffer)
+        except Exception:
+            # Don't leave the buffer stuck waiting on a flush that will never run.
+            with self._log_lock:
+                self._log_flush_pending = False
+            raise
+
+    def _flush_log_buffer(self):
+        """
+        Print all the buffered log messages to the maxscript listener.
+        """
+        with self._log_lock:
+            messages = list(self._log_buffer)
+            self._log_buffer.clear()
+            self._log_flush_pending = False
+
+        if messages:
+            self._print_output("\n".join(messages))
 
     def _print_output(self, msg):
         """
@@ -404,28 +606,36 @@ class MaxEngine(sgtk.platform.Engine):
 
         :return: QT Parent window (:class:`PySide.QtGui.QWidget`)
         """
+        # The main window lives as long as the 3ds Max session does, so look it
+        # up once and reuse it.
+        if self._main_window is not None:
+            return self._main_window
+
         # Older versions of Max make use of special logic in _create_dialog
         # to handle window parenting. If we can, though, we should go with
         # the more standard approach to getting the main window.
-        if self._max_version_to_year(self._get_max_version()) > 2020:
+        if self._get_max_year() > 2020:
             # getMAXHWND returned a float instead of a long, which was completely
             # unusable with PySide in 2017 to 2020, but starting 2021
             # we can start using it properly.
             # This logic was taken from
             # https://help.autodesk.com/view/3DSMAX/2020/ENU/?guid=__developer_creating_python_uis_html
             import shiboken2
-            from sgtk.platform.qt import QtGui
+
+            QtCore, QtGui = _qt()
 
             widget = QtGui.QWidget.find(pymxs.runtime.windows.getMAXHWND())
-            return shiboken2.wrapInstance(
+            self._main_window = shiboken2.wrapInstance(
                 shiboken2.getCppPointer(widget)[0], QtGui.QMainWindow
             )
-        elif self._max_version_to_year(self._get_max_version()) > 2017:
+        elif self._get_max_year() > 2017:
             #
-            return MaxPlus.GetQMaxMainWindow()
+            self._main_window = MaxPlus.GetQMaxMainWindow()
         else:
             return super(MaxEngine, self)._get_dialog_parent()
 
+        return self._main_window
+
     def show_panel(self, panel_id, title, bundle, widget_class, *args, **kwargs):
         """
         Docks an app widget in a 3dsmax panel.
@@ -439,11 +649,11 @@ class MaxEngine(sgtk.platform.Engine):
 
         :returns: the created widget_class instance
         """
-        from sgtk.platform.qt import QtCore, QtGui
+        QtCore, QtGui = _qt()
 
         self.log_debug("Begin showing panel %s" % panel_id)
 
-        if self._max_version_to_year(self._get_max_version()) <= 2017:
+        if self._get_max_year() <= 2017:
             # Qt docking is supported in version 2018 and later.
             self.log_warning(
                 "Panel functionality not implemented. Falling back to showing "
@@ -457,13 +667,23 @@ class MaxEngine(sgtk.platform.Engine):
 
         main_window = self._get_dialog_parent()
         # Check if the dock widget wrapper already exists.
-        dock_widget = main_window.findChild(QtGui.QDockWidget, dock_widget_id)
+        dock_widget = self._dock_widgets_by_id.get(dock_widget_id)
+        if dock_widget is None:
+            # A previous engine may have left the dock widget on the main window,
+            # as docks aren't closed when the engine is destroyed. Adopt it
+            # rather than creating a second one with the same object name.
+            dock_widget = main_window.findChild(QtGui.QDockWidget, dock_widget_id)
+            if dock_widget is not None:
+                dock_widget.closed.connect(
+                    self._remove_dock_widget, QtCore.Qt.DirectConnection
+                )
+                self._dock_widgets_by_id[dock_widget_id] = dock_widget
 
         if dock_widget is None:
-            # The dock widget wrapper cannot be found in the main window's
-            # children list so that means it has not been created yet, so create it.
+            # The dock widget wrapper hasn't been created yet, or it has been
+            # closed since, so create it.
             widget_instance = widget_class(*args, **kwargs)
-            widget_instance.setParent(self._get_dialog_parent())
+            widget_instance.setParent(main_window)
             widget_instance.setObjectName(panel_id)
 
             class DockWidget(QtGui.QDockWidget):
@@ -483,8 +703,12 @@ class MaxEngine(sgtk.platform.Engine):
             dock_widget = DockWidget(title, parent=main_window)
             dock_widget.setObjectName(dock_widget_id)
             dock_widget.setWidget(widget_instance)
-            # Add a callback to remove the dock_widget from the list of open panels and delete it
-            dock_widget.closed.connect(self._remove_dock_widget)
+            # Add a callback to remove the dock_widget from the list of open panels and delete it.
+            # The signal is only ever emitted from the main thread, so connect it
+            # directly rather than having Qt work out the connection type on each emit.
+            dock_widget.closed.connect(
+                self._remove_dock_widget, QtCore.Qt.DirectConnection
+            )
             self.log_debug("Created new dock widget %s" % dock_widget_id)
 
             # Disable 3dsMax accelerators, in order for QTextEdit and QLineEdit
@@ -492,7 +716,7 @@ class MaxEngine(sgtk.platform.Engine):
             widget_instance.setProperty("NoMaxAccelerators", True)
 
             # Remember the dock widget, so we can delete it later.
-            self._dock_widgets.append(dock_widget)
+            self._dock_widgets_by_id[dock_widget_id] = dock_widget
         else:
             # The dock widget wrapper already exists, so just get the
             # shotgun panel from it.
@@ -502,11 +726,20 @@ class MaxEngine(sgtk.platform.Engine):
         # apply external stylesheet
         self._apply_external_stylesheet(bundle, widget_instance)
 
-        if not main_window.restoreDockWidget(dock_widget):
-            # The dock widget cannot be restored from the main window's state,
-            # so dock it to the right dock area and make it float by default.
-            main_window.addDockWidget(QtCore.Qt.RightDockWidgetArea, dock_widget)
-            dock_widget.setFloating(True)
+        if dock_widget.isVisible() and not dock_widget.isFloating():
+            # The panel is already shown and docked, so just bring it forward.
+            dock_widget.raise_()
+            return widget_instance
+
+        # Only place the dock widget the first time it is shown, after that it
+        # stays wherever it was left.
+        if not dock_widget.property("sg_restored"):
+            if not main_window.restoreDockWidget(dock_widget):
+                # The dock widget cannot be restored from the main window's state,
+                # so dock it to the right dock area and make it float by default.
+                main_window.addDockWidget(QtCore.Qt.RightDockWidgetArea, dock_widget)
+                dock_widget.setFloating(True)
+            dock_widget.setProperty("sg_restored", True)
 
         dock_widget.show()
         return widget_instance
@@ -516,7 +749,7 @@ class MaxEngine(sgtk.platform.Engine):
         Removes a docked widget (panel) opened by the engine
         """
         self._get_dialog_parent().removeDockWidget(dock_widget)
-        self._dock_widgets.remove(dock_widget)
+        self._dock_widgets_by_id.pop(dock_widget.objectName(), None)
         dock_widget.deleteLater()
 
     def close_windows(self):
@@ -540,9 +773,18 @@ class MaxEngine(sgtk.platform.Engine):
                     "Cannot close dialog %s: %s" % (dialog_window_title, exception)
                 )
 
-        # Close all dock widgets previously added.
-        for dock_widget in self._dock_widgets[:]:
-            dock_widget.close()
+        # Close all dock widgets previously added. Their closed signal is blocked
+        # so that each close doesn't go through _remove_dock_widget, they are
+        # all forgotten and removed from the main window here instead.
+        dock_widgets = list(self._dock_widgets_by_id.values())
+        self._dock_widgets_by_id.clear()
+        if dock_widgets:
+            main_window = self._get_dialog_parent()
+            for dock_widget in dock_widgets:
+                dock_widget.blockSignals(True)
+                dock_widget.close()
+                main_window.removeDockWidget(dock_widget)
+                dock_widget.deleteLater()
 
     def _create_dialog(self, title, bundle, widget, parent):
         """
@@ -557,10 +799,7 @@ class MaxEngine(sgtk.platform.Engine):
         # enough version of 3ds Max. Anything short of 2016 SP1 is going to
         # fail here with an AttributeError, so we can just catch that and
         # continue on without the new-style parenting.
-        if (
-            self._parent_to_max
-            and self._max_version_to_year(self._get_max_version()) <= 2019
-        ):
+        if self._parent_to_max and self._get_max_year() <= 2019:
             previous_parent = dialog.parent()
             try:
                 self.log_debug("Attempting to attach dialog to 3ds Max...")
@@ -579,13 +818,94 @@ class MaxEngine(sgtk.platform.Engine):
         dialog.installEventFilter(self.dialogEvents)
 
         # Add to tracked dialogs (will be removed in eventFilter)
-        self._safe_dialog.append(dialog)
+        self._safe_dialog.add(dialog)
 
         # Apply the engine-level stylesheet.
         self._apply_external_styleshet(self, dialog)
 
         return dialog
 
+    def _read_external_stylesheet(self, bundle, force=False):
+        """
+        Returns the std external stylesheet associated with a bundle, with its
+        tokens resolved.
+
+        The style.qss file is only read from disk the first time it is needed,
+        or when it has been modified since.
+
+        :param bundle: App, engine or framework object to get the style for.
+        :param bool force: Read the file even if its modification time hasn't
+            changed since it was cached.
+        :returns: The stylesheet string, or None if the bundle doesn't have one.
+        """
+        if bundle is self and self._qss_file:
+            qss_file = self._qss_file
+        else:
+            qss_file = os.path.join(
+                bundle.disk_location, sgtk.platform.constants.BUNDLE_STYLESHEET_FILE
+            )
+        try:
+            mtime = os.path.getmtime(qss_file)
+        except OSError:
+            # The file doesn't exist or can't be reached, so nothing to do.
+            return None
+
+        cached = _QSS_CACHE.get(qss_file)
+        if not force and cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        self.log_debug("Reading std style sheet file '%s'" % qss_file)
+        try:
+            # Read as bytes and decode once, rather than going through
+            # text mode's newline translation and locale codec.
+            with open(qss_file, "rb") as f:
+                qss_data = f.read().decode("utf-8")
+            qss_data = self._resolve_sg_stylesheet_tokens(qss_data)
+        except Exception as e:
+            # catch-all and issue a warning and continue.
+            self.log_warning("Could not read stylesheet '%s': %s" % (qss_file, e))
+            return None
+
+        _QSS_CACHE[qss_file] = (mtime, qss_data)
+        return qss_data
+
+    def _set_widget_stylesheet(self, widget, qss_data):
+        """
+        Applies a stylesheet to a widget (and all its children).
+
+        :param widget: Widget to apply the stylesheet to.
+        :param str qss_data: Stylesheet to apply.
+        """
+        # Setting a style sheet makes Qt re-parse it and re-polish the widget
+        # and all of its children, so skip it when nothing would change.
+        if widget.styleSheet() != qss_data:
+            widget.setStyleSheet(qss_data)
+
+    def _apply_external_stylesheet(self, bundle, widget):
+        """
+        Apply the std external stylesheet associated with a bundle to a widget.
+
+        This overrides the base implementation so that the style.qss file is
+        only read from disk the first time it is applied, or when it has been
+        modified since.
+
+        :param bundle: App, engine or framework object to apply the style for.
+        :param widget: Widget to apply the stylesheet to.
+        """
+        qss_data = self._read_external_stylesheet(bundle)
+        if qss_data is None:
+            return
+
+        self.log_debug("Applying std style sheet of %s to widget %s" % (bundle, widget))
+        try:
+            self._set_widget_stylesheet(widget, qss_data)
+        except Exception as e:
+            # catch-all and issue a warning and continue.
+            self.log_warning("Could not apply stylesheet of %s: %s" % (bundle, e))
+
+    # The base class exposes this method under both spellings.
+    _apply_external_styleshet = _apply_external_stylesheet
+
     def reload_qss(self):
         """
         Causes the style.qss file that comes with the tk-rv engine to
@@ -593,12 +913,19 @@ class MaxEngine(sgtk.platform.Engine):
         launched.
         """
         self.log_warning("Reloading engine QSS...")
+        # Read the stylesheet once and share it between all the dialogs. The
+        # watcher only calls this when the file changed, so don't trust its
+        # modification time, which may not have been updated.
+        qss_data = self._read_external_stylesheet(self, force=True)
+        if qss_data is None:
+            return
+
         for dialog in self.created_qt_dialogs:
-            self._apply_external_styleshet(self, dialog)
+            self._set_widget_stylesheet(dialog, qss_data)
             dialog.update()
 
     def show_modal(self, title, bundle, widget_class, *args, **kwargs):
-        from sgtk.platform.qt import QtGui
+        QtCore, QtGui = _qt()
 
         if not self.has_ui:
             self.log_error(
@@ -647,11 +974,13 @@ class MaxEngine(sgtk.platform.Engine):
 
         # Merge operation can cause max dialogs to pop up, and closing the window results in a crash.
         # So keep alive and hide all of our qt windows while this type of operations are occuring.
-        from sgtk.platform.qt import QtGui
+        QtCore, QtGui = _qt()
 
         toggled = []
 
-        for dialog in self._safe_dialog:
+        # Iterate over a copy, as processing events can close dialogs and
+        # remove them from the set.
+        for dialog in list(self._safe_dialog):
             needs_toggling = dialog.isVisible()
 
             if needs_toggling:
@@ -687,7 +1016,8 @@ class MaxEngine(sgtk.platform.Engine):
         Get the max year from the max release version.
         Note that while 17000 is 2015, 17900 would be 2016 alpha
         """
-        year = 2000 + (math.ceil(version / 1000.0) - 2)
+        # Equivalent to 2000 + ceil(version / 1000) - 2, in integer arithmetic.
+        year = 1998 + (version + 999) // 1000
         return year
 
     def _get_max_version(self):
@@ -695,6 +1025,7 @@ class MaxEngine(sgtk.platform.Engine):
         Returns Version integer of max release number.
         """
         if self._max_version is None:
+            # This is only reached when the version is needed before pre_app_init.
             # Make sure this gets executed from the main thread because pymxs can't be used
             # from a background thread.
             self._max_version = self.execute_in_main_thread(
@@ -702,3 +1033,11 @@ class MaxEngine(sgtk.platform.Engine):
             )
         # 3dsMax Version returns a number which contains max version, sdk version, etc...
         return self._max_version
+
+    def _get_max_year(self):
+        """
+        Returns the release year of the running 3ds Max.
+        """
+        if self._max_year is None:
+            self._max_year = self._max_version_to_year(self._get_max_version())
+        return self._max_year
@@ -12,6 +12,7 @@ from __future__ import print_function
 from pymxs import runtime as rt
 import os
 import sys
+import functools
 import hashlib
 
 from . import constants
@@ -222,7 +223,7 @@ class AsyncInvoker(QtCore.QObject):
         :returns:           The result returned by the function
         """
 
-        self.__signal.emit(lambda: fn(*args, **kwargs))
+        self.__signal.emit(functools.partial(fn, *args, **kwargs))
 
     def __execute_in_main_thread(self, fn):
         fn()
@@ -276,9 +277,7 @@ def _login_user():
     invoker = AsyncInvoker()
 
     # set up a simple progress reporter
-    toolkit_mgr.progress_callback = lambda percent, msg: progress_callback(
-        invoker, percent, msg
-    )
+    toolkit_mgr.progress_callback = functools.partial(progress_callback, invoker)
 
     # start engine
     sgtk_logger.info("Starting the 3dsmax engine.")
@@ -384,9 +383,11 @@ def _delete_login_menu():
         rt.menuMan.unregisterMenu(old_menu)
 
 
-def _jump_to_website():
+def _open_url(url):
     """
-    Jumps to the Shotgun website in the default web browser.
+    Opens the given url in the default web browser.
+
+    :param str url: Url to open.
     """
 
     # At this point, the engine is not launched, so "QtCore" and
@@ -397,25 +398,21 @@ def _jump_to_website():
     QtCore = qt_importer.QtCore
     QtGui = qt_importer.QtGui
 
-    QtGui.QDesktopServices.openUrl(QtCore.QUrl("https://www.shotgridsoftware.com"))
+    QtGui.QDesktopServices.openUrl(QtCore.QUrl(url))
 
 
-def _jump_to_signup():
+def _jump_to_website():
     """
-    Jumps to the Shotgun signup page in the default web browser.
+    Jumps to the Shotgun website in the default web browser.
     """
+    _open_url("https://www.shotgridsoftware.com")
 
-    # At this point, the engine is not launched, so "QtCore" and
-    # "QtGui" variables are not defined in sgtk.platform.qt yet.
-    from sgtk.util.qt_importer import QtImporter
-
-    qt_importer = QtImporter()
-    QtCore = qt_importer.QtCore
-    QtGui = qt_importer.QtGui
 
-    QtGui.QDesktopServices.openUrl(
-        QtCore.QUrl("https://www.shotgridsoftware.com/signup")
-    )
+def _jump_to_signup():
+    """
+    Jumps to the Shotgun signup page in the default web browser.
+    """
+    _open_url("https://www.shotgridsoftware.com/signup")
 
 
 def _get_plugin_info():
@@ -108,10 +108,12 @@ def bootstrap_sgtk():
             # patch this up by adding to the pythonpath
             resources = os.path.join(os.path.dirname(__file__), "..", "..", "resources")
             ssl_path = os.path.join(resources, "ssl_fix")
-            sys.path.insert(0, ssl_path)
+            if ssl_path not in sys.path:
+                sys.path.insert(0, ssl_path)
             path_parts = os.environ.get("PYTHONPATH", "").split(";")
-            path_parts = [ssl_path] + path_parts
-            os.environ["PYTHONPATH"] = ";".join(path_parts)
+            if ssl_path not in path_parts:
+                path_parts = [ssl_path] + path_parts
+                os.environ["PYTHONPATH"] = ";".join(path_parts)
     else:
         error("ShotGrid: Unknown platform - cannot setup ssl")
         return
@@ -18,12 +18,120 @@ import pymxs
 
 from tank_vendor.shotgun_api3.lib import six
 
+# MaxScript helper functions, keyed by name. Each one is defined in the 3ds Max
+# session the first time it is needed and then called directly through pymxs,
+# instead of having MaxScript parse the same snippet again on every call.
+_MAXSCRIPT_FUNCTIONS = {
+    "sgtk_unregister_menu": """
+        -- clear the menu
+        fn sgtk_unregister_menu menu_name = (
+            local sgtk_oldMenu = menuMan.findMenu menu_name
+            if sgtk_oldMenu != undefined then menuMan.unregisterMenu sgtk_oldMenu
+        )
+    """,
+    "sgtk_set_menu_enabled": """
+        global sgtk_main_menu_enabled
+        fn sgtk_set_menu_enabled enabled = (
+            sgtk_main_menu_enabled = enabled
+        )
+    """,
+}
+
+# Names of the helper functions already defined in this session.
+_installed_functions = set()
+
+# The (action name, python code) each menu action macro was last defined with,
+# keyed by macro name.
+_defined_macros = {}
+
+# Macro definitions queued in the current batch. They are only moved to
+# _defined_macros once the batch has run successfully.
+_pending_macros = {}
+
+
+def _to_maxscript_literal(value):
+    """
+    Returns the MaxScript literal for a Python string or boolean.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return '"%s"' % value.replace("\\", "\\\\").replace('"', '\\"')
+
 
 class MaxScript:
     """
     MaxScript/Python Bridge Utilities
     """
 
+    # MaxScript snippets collected while a batch is open, None otherwise.
+    _batch = None
+
+    @staticmethod
+    def begin_batch():
+        """
+        Start collecting the MaxScript run by this class instead of running it.
+
+        Everything executed until :meth:`end_batch` is called is run as a single
+        script, which saves a round trip to MaxScript for each menu item.
+        """
+        MaxScript._batch = []
+        _pending_macros.clear()
+
+    @staticmethod
+    def end_batch():
+        """
+        Run all the MaxScript collected since :meth:`begin_batch` was called.
+        """
+        batch = MaxScript._batch
+        MaxScript._batch = None
+        try:
+            if batch:
+                pymxs.runtime.execute("\n".join(batch))
+        except Exception:
+            # The script may have stopped before, or part way through, any of
+            # the queued macros, so forget them and have them redefined next time.
+            for macro_name in _pending_macros:
+                _defined_macros.pop(macro_name, None)
+            raise
+        else:
+            _defined_macros.update(_pending_macros)
+        finally:
+            _pending_macros.clear()
+
+    @staticmethod
+    def _execute(script):
+        """
+        Run a MaxScript snippet, or add it to the current batch if one is open.
+
+        :param str script: MaxScript code to run.
+        """
+        if MaxScript._batch is not None:
+            MaxScript._batch.append(script)
+        else:
+            pymxs.runtime.execute(script)
+
+    @staticmethod
+    def _call(function_name, *args):
+        """
+        Call one of the MaxScript helper functions, defining it first if needed.
+
+        :param str function_name: Name of the function in ``_MAXSCRIPT_FUNCTIONS``.
+        :param args: Strings or booleans to pass to the MaxScript function.
+        :returns: The value returned by the MaxScript function, or None when
+            the call was added to the current batch.
+        """
+        if function_name not in _installed_functions:
+            pymxs.runtime.execute(_MAXSCRIPT_FUNCTIONS[function_name])
+            _installed_functions.add(function_name)
+
+        if MaxScript._batch is not None:
+            # Keep the call in order with the rest of the batch.
+            MaxScript._batch.append(
+                " ".join([function_name] + [_to_maxscript_literal(a) for a in args])
+            )
+            return None
+        return getattr(pymxs.runtime, function_name)(*args)
+
     @staticmethod
     def add_to_menu(from_menu_var, to_menu_var, from_menu_name):
         """
@@ -32,14 +140,14 @@ class MaxScript:
         :param to_menu_var: MaxScript variable name of menu to add to
         :param from_menu_name: Name of menu item to give to MaxScript
         """
-        pymxs.runtime.execute(
+        MaxScript._execute(
             """
-            sgtk_menu_sub_item = menuMan.createSubMenuItem "{from_menu_name}" {from_menu_var}
+            sgtk_menu_sub_item = menuMan.createSubMenuItem {from_menu_name} {from_menu_var}
             {to_menu_var}.addItem sgtk_menu_sub_item -1
         """.format(
                 from_menu_var=from_menu_var,
                 to_menu_var=to_menu_var,
-                from_menu_name=from_menu_name,
+                from_menu_name=_to_maxscript_literal(from_menu_name),
             )
         )
 
@@ -54,12 +162,12 @@ class MaxScript:
         MaxScript.unregister_menu("Shotgun")
 
         MaxScript.unregister_menu(menu_name)
-        pymxs.runtime.execute(
+        MaxScript._execute(
             """
             -- create the main menu
-            {menu_var} = menuMan.createMenu "{menu_name}"
+            {menu_var} = menuMan.createMenu {menu_name}
         """.format(
-                menu_var=menu_var, menu_name=menu_name
+                menu_var=menu_var, menu_name=_to_maxscript_literal(menu_name)
             )
         )
 
@@ -70,15 +178,7 @@ class MaxScript:
 
         :param str menu_name: Name of the menu in the menu bar.
         """
-        pymxs.runtime.execute(
-            """
-            -- clear the menu
-            sgtk_oldMenu = menuMan.findMenu "{menu_name}"
-            if sgtk_oldMenu != undefined then menuMan.unregisterMenu sgtk_oldMenu
-        """.format(
-                menu_name=menu_name
-            )
-        )
+        MaxScript._call("sgtk_unregister_menu", menu_name)
 
     @staticmethod
     def add_separator(menu_var):
@@ -87,7 +187,7 @@ class MaxScript:
         :param menu_var: MaxScript variable name of the menu to add separator into
         """
 
-        pymxs.runtime.execute(
+        MaxScript._execute(
             """
             sgtk_menu_separator = menuMan.createSeparatorItem()
             {menu_var}.addItem sgtk_menu_separator -1
@@ -104,16 +204,16 @@ class MaxScript:
         :param menu_name: String name of the menu to add
         """
 
-        pymxs.runtime.execute(
+        MaxScript._execute(
             """
             -- Add main menu to Max, second to last which should be before Help
             sgtk_main_menu_bar = menuMan.getMainMenuBar()
             sgtk_sub_menu_index = sgtk_main_menu_bar.numItems() - 1
-            sgtk_sub_menu_item = menuMan.createSubMenuItem "{menu_name}" {menu_var}
+            sgtk_sub_menu_item = menuMan.createSubMenuItem {menu_name} {menu_var}
             sgtk_main_menu_bar.addItem sgtk_sub_menu_item sgtk_sub_menu_index
             menuMan.updateMenuBar()
         """.format(
-                menu_var=menu_var, menu_name=menu_name
+                menu_var=menu_var, menu_name=_to_maxscript_literal(menu_name)
             )
         )
 
@@ -173,8 +273,15 @@ class MaxScript:
             "    engine.log_error('SG Error: Failed to find Action command in MAXScript callback for action [{action_name}]!')\n"
         ).format(hash_name=hash_name, command_name=method_name, action_name=action_name)
 
-        pymxs.runtime.execute(
-            """
+        # Menus get rebuilt on every context change, but the macro for a given
+        # action is almost always the same, so only (re)define it when it changed.
+        macro_definition = (action_name, python_code)
+        current_definition = _pending_macros.get(
+            macro_name, _defined_macros.get(macro_name)
+        )
+        if current_definition != macro_definition:
+            MaxScript._execute(
+                """
             -- Create MacroScript that will callback to our python object
             macroScript {macro_name}
             category: "ShotGrid Menu Actions"
@@ -195,7 +302,20 @@ class MaxScript:
                         print "SG Warning: You need to close the current window dialog before using any more commands."
 	            )
             )
+        """.format(
+                    macro_name=macro_name,
+                    action_name=action_name,
+                    python_code=python_code,
+                )
+            )
+            if MaxScript._batch is not None:
+                # The macro only exists once the batch has run.
+                _pending_macros[macro_name] = macro_definition
+            else:
+                _defined_macros[macro_name] = macro_definition
 
+        MaxScript._execute(
+            """
             -- Add menu item using previous MacroScript action
             sgtk_menu_action = menuMan.createActionItem "{macro_name}" "ShotGrid Menu Actions"
             sgtk_menu_action.setUseCustomTitle true
@@ -205,7 +325,6 @@ class MaxScript:
                 macro_name=macro_name,
                 menu_var=menu_var,
                 action_name=action_name,
-                python_code=python_code,
             )
         )
 
@@ -217,7 +336,7 @@ class MaxScript:
 
         This is used to disable actions while a modal window is opened.
         """
-        pymxs.runtime.execute("sgtk_main_menu_enabled = False")
+        MaxScript._call("sgtk_set_menu_enabled", False)
 
     @staticmethod
     def enable_menu():
@@ -225,4 +344,4 @@ class MaxScript:
         Sets a flag so that menu actions can be called.
         """
 
-        pymxs.runtime.execute("sgtk_main_menu_enabled = True")
+        MaxScript._call("sgtk_set_menu_enabled", True)
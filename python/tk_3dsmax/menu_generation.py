@@ -12,11 +12,8 @@
 Menu handling for 3ds Max
 """
 import os
-import sys
 import traceback
-import unicodedata
 
-from sgtk.platform.qt import QtCore, QtGui
 from .maxscript import MaxScript
 
 MENU_LABEL = "ShotGrid"
@@ -50,57 +47,67 @@ class MenuGenerator(object):
         """
         Create the Shotgun Menu
         """
+        # Send the whole menu to MaxScript in one go rather than one snippet
+        # per menu item.
+        MaxScript.begin_batch()
+        try:
+            # The previous menu is replaced entirely, so forget the objects its
+            # actions referred to. This keeps the action keys, and so the macros
+            # referring to them, the same from one rebuild to the next.
+            self._engine.maxscript_objects.clear()
 
-        # Create the main menu
-        MaxScript.create_menu(MENU_LABEL, self._menu_var)
-
-        # enumerate all items and create menu objects for them
-        cmd_items = []
-        for (cmd_name, cmd_details) in self._engine.commands.items():
-            cmd_items.append(AppCommand(cmd_name, cmd_details))
-
-        # start with context menu
-        self._create_context_builder()
-        for cmd in cmd_items:
-            if cmd.get_type() == "context_menu":
-                cmd.add_to_menu(self._ctx_var, self._engine)
-
-        # now favourites
-        for fav in self._engine.get_setting("menu_favourites", []):
-            app_instance_name = fav["app_instance"]
-            menu_name = fav["name"]
-            # scan through all menu items
-            for cmd in cmd_items:
-                if (
-                    cmd.get_app_instance_name() == app_instance_name
-                    and cmd.name == menu_name
-                ):
-                    # found our match!
-                    cmd.add_to_menu(self._menu_var, self._engine)
-                    # mark as a favourite item
-                    cmd.favourite = True
-
-        MaxScript.add_separator(self._menu_var)
-
-        # now go through all of the menu items.
-        # separate them out into various sections
-        commands_by_app = {}
+            # Create the main menu
+            MaxScript.create_menu(MENU_LABEL, self._menu_var)
 
-        for cmd in cmd_items:
-            if cmd.get_type() != "context_menu":
-                # normal menu
-                app_name = cmd.get_app_name()
-                if app_name is None:
-                    # un-parented app
-                    app_name = "Other Items"
-                if not app_name in commands_by_app:
-                    commands_by_app[app_name] = []
-                commands_by_app[app_name].append(cmd)
+            # enumerate all items and create menu objects for them
+            cmd_items = []
+            for (cmd_name, cmd_details) in self._engine.commands.items():
+                cmd_items.append(AppCommand(cmd_name, cmd_details))
 
-        # now add all apps to main menu
-        self._add_app_menu(commands_by_app)
+            # start with context menu
+            self._create_context_builder()
+            for cmd in cmd_items:
+                if cmd.get_type() == "context_menu":
+                    cmd.add_to_menu(self._ctx_var, self._engine)
+
+            # now favourites
+            for fav in self._engine.get_setting("menu_favourites", []):
+                app_instance_name = fav["app_instance"]
+                menu_name = fav["name"]
+                # scan through all menu items
+                for cmd in cmd_items:
+                    if (
+                        cmd.get_app_instance_name() == app_instance_name
+                        and cmd.name == menu_name
+                    ):
+                        # found our match!
+                        cmd.add_to_menu(self._menu_var, self._engine)
+                        # mark as a favourite item
+                        cmd.favourite = True
+
+            MaxScript.add_separator(self._menu_var)
+
+            # now go through all of the menu items.
+            # separate them out into various sections
+            commands_by_app = {}
 
-        MaxScript.add_to_main_menu_bar(self._menu_var, MENU_LABEL)
+            for cmd in cmd_items:
+                if cmd.get_type() != "context_menu":
+                    # normal menu
+                    app_name = cmd.get_app_name()
+                    if app_name is None:
+                        # un-parented app
+                        app_name = "Other Items"
+                    if not app_name in commands_by_app:
+                        commands_by_app[app_name] = []
+                    commands_by_app[app_name].append(cmd)
+
+            # now add all apps to main menu
+            self._add_app_menu(commands_by_app)
+
+            MaxScript.add_to_main_menu_bar(self._menu_var, MENU_LABEL)
+        finally:
+            MaxScript.end_batch()
 
     def destroy_menu(self):
         MaxScript.unregister_menu(MENU_LABEL)
@@ -131,6 +138,8 @@ class MenuGenerator(object):
         """
         Jump from context to Sg
         """
+        from sgtk.platform.qt import QtCore, QtGui
+
         url = self._engine.context.shotgun_url
         QtGui.QDesktopServices.openUrl(QtCore.QUrl(url))
 
@@ -187,6 +196,8 @@ class AppCommand(object):
         self.properties = command_dict["properties"]
         self.callback = command_dict["callback"]
         self.favourite = False
+        # Set while the callback is running.
+        self._running = False
 
     def get_app_name(self):
         """
@@ -250,6 +261,17 @@ class AppCommand(object):
         """
         Delegate method for this command
         """
+        if self._running:
+            # The menu item was triggered again while the command was still
+            # processing events, e.g. from a quick double click, so drop it.
+            engine = self.get_engine()
+            if engine is not None:
+                engine.log_debug(
+                    "Command '%s' is already running, ignoring." % self.name
+                )
+            return
+
+        self._running = True
         try:
             self.callback()
         except:
@@ -258,6 +280,8 @@ class AppCommand(object):
             engine = self.get_engine()
             if engine is not None:
                 engine.log_error("Failed to call command '%s'. '%s'!" % (self.name, tb))
+        finally:
+            self._running = False
 
     def add_to_menu(self, menu_var, engine):
         """
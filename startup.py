@@ -71,8 +71,11 @@ class MaxLauncher(SoftwareLauncher):
         # for the native Max install are sourced. If we don't do this, we end
         # up with dlls loaded from SG Desktop's bin and we have a mismatch that
         # results in complete breakage.
+        # The launcher's environment persists across launches, so skip the
+        # putenv when the path is already listed.
         max_root = os.path.dirname(exec_path)
-        sgtk.util.prepend_path_to_env_var("PATH", max_root)
+        if max_root not in os.environ.get("PATH", "").split(os.pathsep):
+            sgtk.util.prepend_path_to_env_var("PATH", max_root)
 
         required_env = {}
 